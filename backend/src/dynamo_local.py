@@ -0,0 +1,192 @@
+import bisect
+import copy
+import json
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# Local stand-in for the boto3 DynamoDB resource used by repositories_dynamo.
+# Supports just the Table calls the repositories make (get_item, put_item and
+# query on the base table or gsi1) and meters consumed capacity the way
+# DynamoDB bills it, so load tests can run without AWS.
+#
+#   import repositories_dynamo
+#   repositories_dynamo.dynamodb = LocalDynamoResource()
+
+QUERY_PAGE_BYTES = 1024 * 1024  # DynamoDB stops a query page at 1MB
+READ_UNIT_BYTES = 4 * 1024
+WRITE_UNIT_BYTES = 1024
+
+INDEX_KEYS = {
+    None: ("pk", "sk"),
+    "gsi1": ("gsi1pk", "gsi1sk"),
+}
+
+
+def item_size(item: Dict[str, Any]) -> int:
+    """Approximate DynamoDB item size: attribute names plus serialized values."""
+    return sum(len(k) + len(json.dumps(v, default=str)) for k, v in item.items())
+
+
+def _read_units(size: int) -> float:
+    # Eventually consistent reads (the boto3 default) cost half a unit per 4KB.
+    return max(1, math.ceil(size / READ_UNIT_BYTES)) * 0.5
+
+
+def _write_units(size: int) -> float:
+    return float(max(1, math.ceil(size / WRITE_UNIT_BYTES)))
+
+
+def _split_key_condition(condition, hash_key: str) -> Tuple[Any, List[Tuple[str, Any]]]:
+    """Parse a boto3 key condition once into (hash value, [(op, value) on the range key])."""
+    expr = condition.get_expression()
+    parts = expr["values"] if expr["operator"] == "AND" else (condition,)
+    hash_value = None
+    range_conditions = []
+    for part in parts:
+        part_expr = part.get_expression()
+        op = part_expr["operator"]
+        attr, value = part_expr["values"][0].name, part_expr["values"][1]
+        if op == "=" and attr == hash_key:
+            hash_value = value
+        elif op in ("=", "begins_with"):
+            range_conditions.append((op, value))
+        else:
+            raise NotImplementedError(f"Key condition not supported locally: {op}")
+    if hash_value is None:
+        raise NotImplementedError(f"Query needs an equality condition on {hash_key}")
+    return hash_value, range_conditions
+
+
+def _range_matches(range_value: Any, conditions: List[Tuple[str, Any]]) -> bool:
+    for op, value in conditions:
+        if op == "=" and range_value != value:
+            return False
+        if op == "begins_with" and not (isinstance(range_value, str) and range_value.startswith(value)):
+            return False
+    return True
+
+
+def _entry(item: Dict[str, Any], range_key: str) -> tuple:
+    # Partition entries sort by range key; pk/sk break ties and locate the item.
+    return (item.get(range_key) or "", item["pk"], item["sk"])
+
+
+@dataclass
+class ConsumedCapacity:
+    read_units: float = 0.0
+    write_units: float = 0.0
+    reads: int = 0
+    writes: int = 0
+
+
+class LocalTable:
+    """
+    Items are kept per (pk, sk) and indexed per partition for the base table
+    and gsi1 ({hash value: sorted range entries}), so a query touches only its
+    own partition and costs the same however much other tenants store.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.items: Dict[tuple, Dict[str, Any]] = {}
+        self.capacity = ConsumedCapacity()
+        self.items_examined = 0  # items a query looked at; flat per partition
+        self._sizes: Dict[tuple, int] = {}
+        self._partitions: Dict[Optional[str], Dict[Any, List[tuple]]] = {index: {} for index in INDEX_KEYS}
+        self._lock = threading.Lock()
+
+    def _charge_read(self, size: int):
+        self.capacity.reads += 1
+        self.capacity.read_units += _read_units(size)
+
+    def _index(self, item: Dict[str, Any]):
+        for index, (hash_key, range_key) in INDEX_KEYS.items():
+            if item.get(hash_key) is not None:
+                bisect.insort(self._partitions[index].setdefault(item[hash_key], []), _entry(item, range_key))
+
+    def _unindex(self, item: Dict[str, Any]):
+        for index, (hash_key, range_key) in INDEX_KEYS.items():
+            if item.get(hash_key) is None:
+                continue
+            partitions = self._partitions[index]
+            entries = partitions[item[hash_key]]
+            del entries[bisect.bisect_left(entries, _entry(item, range_key))]
+            if not entries:
+                del partitions[item[hash_key]]
+
+    def get_item(self, Key: Dict[str, Any]):
+        key = (Key["pk"], Key["sk"])
+        with self._lock:
+            item = self.items.get(key)
+            self._charge_read(self._sizes[key] if item else 0)
+            return {"Item": copy.deepcopy(item)} if item else {}
+
+    def put_item(self, Item: Dict[str, Any]):
+        key = (Item["pk"], Item["sk"])
+        size = item_size(Item)
+        units = _write_units(size)
+        if Item.get("gsi1pk") is not None:
+            units += _write_units(size)  # gsi1 projects ALL attributes
+        item = copy.deepcopy(Item)
+        with self._lock:
+            self.capacity.writes += 1
+            self.capacity.write_units += units
+            old = self.items.get(key)
+            if old is not None:
+                self._unindex(old)  # its gsi1 key may have changed
+            self.items[key] = item
+            self._sizes[key] = size
+            self._index(item)
+            return {}
+
+    def query(self, KeyConditionExpression, IndexName: Optional[str] = None,
+              ExclusiveStartKey: Optional[Dict[str, Any]] = None, Limit: Optional[int] = None):
+        hash_key, range_key = INDEX_KEYS[IndexName]
+        hash_value, range_conditions = _split_key_condition(KeyConditionExpression, hash_key)
+
+        with self._lock:
+            entries = self._partitions[IndexName].get(hash_value, [])
+            # Matching range keys are contiguous: start at the first candidate.
+            lo = 0
+            for _op, value in range_conditions:
+                lo = max(lo, bisect.bisect_left(entries, (value,)))
+            if ExclusiveStartKey:
+                lo = max(lo, bisect.bisect_right(entries, _entry(ExclusiveStartKey, range_key)))
+
+            page: List[Dict[str, Any]] = []
+            scanned = 0
+            truncated = False
+            for i in range(lo, len(entries)):
+                range_value, pk, sk = entries[i]
+                if not _range_matches(range_value, range_conditions):
+                    break
+                if (Limit and len(page) >= Limit) or scanned >= QUERY_PAGE_BYTES:
+                    truncated = True
+                    break
+                self.items_examined += 1
+                page.append(copy.deepcopy(self.items[(pk, sk)]))
+                scanned += self._sizes[(pk, sk)]
+            self._charge_read(scanned)
+
+        resp: Dict[str, Any] = {"Items": page, "Count": len(page)}
+        if truncated and page:
+            last = page[-1]
+            resp["LastEvaluatedKey"] = {k: last[k] for k in ("pk", "sk", hash_key, range_key) if k in last}
+        return resp
+
+
+class LocalDynamoResource:
+    def __init__(self):
+        self.tables: Dict[str, LocalTable] = {}
+        self._lock = threading.Lock()
+
+    def Table(self, name: str) -> LocalTable:
+        with self._lock:
+            if name not in self.tables:
+                self.tables[name] = LocalTable(name)
+            return self.tables[name]
+
+    def reset_capacity(self):
+        for table in self.tables.values():
+            table.capacity = ConsumedCapacity()
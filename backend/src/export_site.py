@@ -0,0 +1,69 @@
+import argparse
+import os
+import sys
+import tempfile
+
+from repositories_dynamo import DynamoSiteRepository, DynamoPageRepository
+from exporter import export_site_zip, default_workers, site_base_url, ExportError
+
+# Usage:
+#   python export_site.py <site_id> -o site.zip
+#   python export_site.py <site_id> -o - --workers 8 > site.zip
+# Uses the same SITES_TABLE / PAGES_TABLE env vars as the lambda.
+
+
+def _export_to_path(path: str, export) -> int:
+    # Write beside the target and rename on success, so a failed export never
+    # leaves a truncated (but valid-looking) zip behind.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".export-", suffix=".zip.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            count = export(f)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)  # mkstemp creates 0600; match a plain open()
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export a site as a static zip archive.")
+    parser.add_argument("site_id")
+    parser.add_argument("-o", "--out", default="-", help="output zip path, or - for stdout")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="render processes")
+    parser.add_argument("--assets-dir", help="directory copied into the archive under assets/")
+    parser.add_argument("--base-url", help="absolute sitemap base URL (defaults to the site's primary domain)")
+    parser.add_argument("--drafts", action="store_true",
+                        help="export every page's current editor state instead of what is published")
+    args = parser.parse_args(argv)
+
+    site = DynamoSiteRepository().get_by_id(args.site_id)
+    if not site:
+        print(f"Site not found: {args.site_id}", file=sys.stderr)
+        return 1
+
+    if not (args.base_url or site_base_url(site)):
+        print("No --base-url or primary domain; sitemap.xml will be omitted", file=sys.stderr)
+
+    pages = DynamoPageRepository().iter_by_site(site.id)
+    try:
+        if args.out == "-":
+            count = export_site_zip(site, pages, sys.stdout.buffer, args.workers, args.assets_dir,
+                                    args.base_url, args.drafts)
+        else:
+            count = _export_to_path(args.out, lambda f: export_site_zip(
+                site, pages, f, args.workers, args.assets_dir, args.base_url, args.drafts))
+    except ExportError as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Exported {count} pages from {site.slug}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import math
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from models import Site, Page
+from renderer import render_page_to_html, page_filename
+
+
+# Pages per pool task. Rendering one page is far cheaper than pickling it to a
+# worker, so tasks carry a batch to amortize the IPC.
+CHUNK_SIZE = 256
+
+# Chunks waiting to be written, per worker. Bounds memory regardless of site size.
+IN_FLIGHT_CHUNKS_PER_WORKER = 2
+
+# Sites with fewer pages than this render in-process; starting a pool costs more.
+POOL_MIN_PAGES = 4 * CHUNK_SIZE
+
+# Shipping a page to a worker and back costs roughly this much; pages that
+# render faster stay in-process, where they are cheaper than the IPC.
+POOL_MIN_RENDER_SECONDS = 50e-6
+
+# The sitemap protocol caps one sitemap file at 50,000 URLs.
+SITEMAP_MAX_URLS = 50_000
+
+
+class ExportError(ValueError):
+    pass
+
+
+def default_workers() -> int:
+    return int(os.environ.get("EXPORT_WORKERS") or os.cpu_count() or 1)
+
+
+def _render_chunk(chunk: List[Tuple[str, Dict[str, Any]]], settings: Dict[str, Any]) -> List[Tuple[str, str]]:
+    return [(name, render_page_to_html(state, settings)) for name, state in chunk]
+
+
+def _chunks(jobs: Iterable[Tuple[str, Dict[str, Any]]], size: int) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+    it = iter(jobs)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _render_serial(jobs: Iterable[Tuple[str, Dict[str, Any]]], settings: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    for name, editor_state in jobs:
+        yield name, render_page_to_html(editor_state, settings)
+
+
+def _render_pooled(pool: ProcessPoolExecutor, workers: int, jobs: Iterable[Tuple[str, Dict[str, Any]]],
+                   settings: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    # Keep a bounded window of chunks so pages are pulled from the repository
+    # only as fast as the zip writer drains them. Results come back in page order.
+    window = max(1, workers * IN_FLIGHT_CHUNKS_PER_WORKER)
+    pending = deque()
+    for chunk in _chunks(jobs, CHUNK_SIZE):
+        pending.append(pool.submit(_render_chunk, chunk, settings))
+        if len(pending) >= window:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+def render_pages(jobs: Iterable[Tuple[str, Dict[str, Any]]], settings: Dict[str, Any],
+                 workers: int = 1) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (file name, html) for every (file name, state) job, in order.
+
+    The first POOL_MIN_PAGES pages render in-process and are timed. The rest
+    go to a process pool only if there are more and they took at least
+    POOL_MIN_RENDER_SECONDS each; otherwise (or when workers <= 1, or when the
+    platform cannot start a pool) everything renders in-process.
+    """
+    jobs = iter(jobs)
+    if workers <= 1:
+        yield from _render_serial(jobs, settings)
+        return
+
+    rendered = 0
+    render_seconds = 0.0
+    for name, state in islice(jobs, POOL_MIN_PAGES):
+        start = time.perf_counter()
+        html = render_page_to_html(state, settings)
+        render_seconds += time.perf_counter() - start
+        rendered += 1
+        yield name, html
+
+    if rendered < POOL_MIN_PAGES or render_seconds / rendered < POOL_MIN_RENDER_SECONDS:
+        yield from _render_serial(jobs, settings)
+        return
+
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    except (OSError, NotImplementedError):
+        yield from _render_serial(jobs, settings)
+        return
+    with pool:
+        yield from _render_pooled(pool, workers, jobs, settings)
+
+
+def _export_jobs(pages: Iterable[Page], include_drafts: bool) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for page in pages:
+        state = page.editor_state if include_drafts else page.published_state
+        if state is None:
+            continue  # never published
+        yield page_filename(page.slug), state
+
+
+def _check_base_url(base_url: str):
+    if not base_url.startswith(("http://", "https://")):
+        raise ExportError(f"Sitemap base URL must be absolute: {base_url!r}")
+
+
+def _write_urlset(zf: zipfile.ZipFile, name: str, locs: Iterable[str]):
+    with zf.open(name, "w") as f:
+        f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for loc in locs:
+            f.write(f"  <url><loc>{escape(loc)}</loc></url>\n".encode("utf-8"))
+        f.write(b"</urlset>\n")
+
+
+def write_sitemaps(zf: zipfile.ZipFile, file_names: Iterable[str], count: int, base_url: str,
+                   directory_index: bool = True):
+    """
+    Stream sitemap.xml for `count` file names into the archive, one <url> at a time.
+    Above SITEMAP_MAX_URLS, pages go into sitemap-N.xml files and sitemap.xml
+    becomes a sitemap index. With directory_index, index.html is listed as its
+    directory ("/"); hosts that don't serve index documents (the S3 REST
+    endpoint) need it off.
+    """
+    _check_base_url(base_url)
+    base = base_url.rstrip("/")
+
+    def loc(name: str) -> str:
+        if directory_index and (name == "index.html" or name.endswith("/index.html")):
+            name = name[:-len("index.html")]
+        return f"{base}/{name}"
+
+    locs = (loc(name) for name in file_names)
+    if count <= SITEMAP_MAX_URLS:
+        _write_urlset(zf, "sitemap.xml", locs)
+        return
+
+    parts = math.ceil(count / SITEMAP_MAX_URLS)
+    for i in range(1, parts + 1):
+        _write_urlset(zf, f"sitemap-{i}.xml", islice(locs, SITEMAP_MAX_URLS))
+
+    with zf.open("sitemap.xml", "w") as f:
+        f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for i in range(1, parts + 1):
+            f.write(f"  <sitemap><loc>{escape(f'{base}/sitemap-{i}.xml')}</loc></sitemap>\n".encode("utf-8"))
+        f.write(b"</sitemapindex>\n")
+
+
+def site_base_url(site: Site) -> Optional[str]:
+    return f"https://{site.primary_domain}" if site.primary_domain else None
+
+
+def export_site_zip(site: Site, pages: Iterable[Page], out: BinaryIO, workers: int = 1,
+                    assets_dir: Optional[str] = None, base_url: Optional[str] = None,
+                    include_drafts: bool = False, directory_index: bool = True) -> int:
+    """
+    Stream a static copy of the site into a zip archive written to `out`.
+
+    Exports each page's published_state and skips pages never published;
+    include_drafts exports the current editor_state of every page instead.
+    Two pages exporting to the same file raise ExportError. sitemap.xml is
+    written only when there is an absolute base URL (`base_url`, else the
+    site's primary domain); see write_sitemaps for directory_index.
+
+    `out` may be non-seekable (stdout, a socket); zipfile then uses data
+    descriptors. Each page is compressed and written as soon as it is rendered,
+    assets are copied from disk in chunks, and the sitemap is streamed from the
+    archive's own entry list, so nothing beyond zipfile's central directory
+    grows with the site. Returns the number of pages written.
+    """
+    base_url = base_url or site_base_url(site)
+    if base_url:
+        _check_base_url(base_url)
+    page_count = 0
+
+    with zipfile.ZipFile(out, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, html in render_pages(_export_jobs(pages, include_drafts), site.settings, workers):
+            if name in zf.NameToInfo:
+                raise ExportError(f"Two pages export to {name}; give them distinct slugs")
+            zf.writestr(name, html.encode("utf-8"))
+            page_count += 1
+
+        if assets_dir:
+            for root, _dirs, files in os.walk(assets_dir):
+                for fname in sorted(files):
+                    full = os.path.join(root, fname)
+                    rel = os.path.relpath(full, assets_dir).replace(os.sep, "/")
+                    zf.write(full, f"assets/{rel}")
+
+        if base_url:
+            # Pages were written first, so they are the first page_count entries.
+            names = (info.filename for info in islice(zf.infolist(), page_count))
+            write_sitemaps(zf, names, page_count, base_url, directory_index)
+
+    return page_count
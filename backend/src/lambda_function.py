@@ -1,13 +1,16 @@
 import json
+import tempfile
 from typing import Any, Dict
 
 from repositories_dynamo import DynamoSiteRepository, DynamoPageRepository
-from renderer import render_page_to_html
-from storage import upload_html_to_s3
+from renderer import render_page_to_html, page_filename
+from storage import get_storage_backend
+from exporter import export_site_zip, site_base_url, ExportError
 from decimal import Decimal
 
 site_repo = DynamoSiteRepository()
 page_repo = DynamoPageRepository()
+storage = get_storage_backend()
 
 def _json_safe(obj):
     """Convert DynamoDB Decimals (and nested structures) into JSON-safe types."""
@@ -75,6 +78,11 @@ def lambda_handler(event, context):
             body = json.loads(event.get("body") or "{}")
             return create_site(account_id, body)
 
+        # /api/sites/{siteId}/export
+        if path.startswith("/api/sites/") and path.endswith("/export") and method == "GET":
+            site_id = path.split("/")[3]
+            return export_site(account_id, site_id)
+
         # /api/sites/{siteId}
         if path.startswith("/api/sites/") and "/pages" not in path:
             site_id = path.split("/")[3]
@@ -188,10 +196,8 @@ def publish_page(account_id: str, page_id: str):
 
     html = render_page_to_html(page.editor_state, site.settings)
 
-    # "" slug = homepage => index.html
-    file_slug = page.slug.strip("/") if page.slug else "index"
-    key = f"sites/{site.id}/{file_slug}.html"
-    url = upload_html_to_s3(key, html)
+    key = f"sites/{site.id}/{page_filename(page.slug)}"
+    url = storage.put_object(key, html.encode("utf-8"))
 
     page = page_repo.update(page.id, {
         "published_state": page.editor_state,
@@ -199,3 +205,35 @@ def publish_page(account_id: str, page_id: str):
     })
 
     return response(200, {"published_html_url": url, "page": page.__dict__})
+
+
+def export_site(account_id: str, site_id: str):
+    site = site_repo.get_by_id(site_id)
+    if not site or site.owner_account_id != account_id:
+        return response(404, {"error": "Site not found"})
+
+    # Sitemap URLs must be absolute: use the custom domain, else where publish puts
+    # the pages. The S3 REST endpoint doesn't serve index documents, so the fallback
+    # lists index.html explicitly.
+    base_url = site_base_url(site)
+    directory_index = True
+    published_root = storage.url_for(f"sites/{site.id}")
+    if not base_url and published_root.startswith(("http://", "https://")):
+        base_url = published_root
+        directory_index = False
+
+    # Spool the archive through /tmp rather than memory; API Gateway can't
+    # stream a response body, so hand back a download URL instead.
+    # Lambda has no /dev/shm for a process pool, so render in-process.
+    with tempfile.TemporaryFile(suffix=".zip") as tmp:
+        try:
+            page_count = export_site_zip(site, page_repo.iter_by_site(site.id), tmp,
+                                         workers=1, base_url=base_url, directory_index=directory_index)
+        except ExportError as e:
+            return response(409, {"error": str(e)})
+        tmp.seek(0)
+        key = f"exports/{site.id}/{site.slug}.zip"
+        storage.put_file(key, tmp, "application/zip")
+    url = storage.download_url(key)
+
+    return response(200, {"export_url": url, "page_count": page_count})
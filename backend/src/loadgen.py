@@ -0,0 +1,513 @@
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Usage:
+#   python loadgen.py --tenants 50 --pages-per-site 100 --mix 70:25:5 --requests 5000 --concurrency 16
+#   python loadgen.py --tenants 50 --record stream.jsonl      # save a synthesized stream
+#   python loadgen.py --replay stream.jsonl --concurrency 32  # replay it
+#   CAPTURE_EVENTS=capture.jsonl python local_runner.py       # capture real events
+#   python loadgen.py --replay capture.jsonl                  # replay a capture
+#
+# Requests run through lambda_handler against local stand-ins: the Dynamo
+# repositories talk to dynamo_local.LocalDynamoResource (which meters consumed
+# capacity) and publishing writes to an InMemoryStorageBackend. Nothing hits AWS.
+# lambda_function is imported lazily, so importing this module has no side effects;
+# library callers run install_stand_ins() before seed()/run().
+
+from dynamo_local import LocalDynamoResource
+from storage import InMemoryStorageBackend, StorageStats
+
+# Paths in a stream reference seeded entities symbolically, resolved at replay
+# time: /api/pages/{page:3:0:7} = tenant 3, site 0, page 7 of a synthesized
+# stream; /api/pages/{page:<id>} = the page seeded for a captured page id.
+REF = re.compile(r"\{(site|page):([^{}/]+)\}")
+
+# /api/sites/{id}... and /api/pages/{id}... in captured events.
+ENTITY_PATH = re.compile(r"^/api/(sites|pages)/([^/]+)(.*)$")
+
+READ_PATHS = [
+    "/api/sites",
+    "/api/sites/{site}",
+    "/api/sites/{site}/pages",
+    "/api/pages/{page}",
+]
+
+
+@dataclass
+class LoadProfile:
+    tenants: int = 10
+    sites_per_tenant: int = 1
+    pages_per_site: int = 20
+    page_size: int = 4096
+    read: int = 70
+    write: int = 25
+    publish: int = 5
+    requests: int = 2000
+    seed: int = 0
+
+
+def _account(tenant: int) -> str:
+    return f"tenant-{tenant}"
+
+
+def _editor_state(rng: random.Random, size: int) -> Dict[str, Any]:
+    filler = "".join(rng.choices("abcdefghij ", k=max(0, size)))
+    return {"title": f"Revision {rng.randrange(1_000_000)}", "raw_html": f"<p>{filler}</p>"}
+
+
+def synthesize(profile: LoadProfile) -> Iterator[Dict[str, Any]]:
+    """Yield `profile.requests` requests drawn from the read/write/publish mix."""
+    rng = random.Random(profile.seed)
+    ops = ["read", "write", "publish"]
+    weights = [profile.read, profile.write, profile.publish]
+
+    for _ in range(profile.requests):
+        t = rng.randrange(profile.tenants)
+        s = rng.randrange(profile.sites_per_tenant)
+        p = rng.randrange(profile.pages_per_site)
+        site_ref = f"{{site:{t}:{s}}}"
+        page_ref = f"{{page:{t}:{s}:{p}}}"
+        op = rng.choices(ops, weights)[0]
+
+        if op == "read":
+            path = rng.choice(READ_PATHS).format(site=site_ref, page=page_ref)
+            yield {"account": _account(t), "method": "GET", "path": path, "body": None}
+        elif op == "write":
+            # Autosave: the editor PATCHes the whole editor_state.
+            body = {"editor_state": _editor_state(rng, profile.page_size)}
+            yield {"account": _account(t), "method": "PATCH", "path": f"/api/pages/{page_ref}", "body": body}
+        else:
+            yield {"account": _account(t), "method": "POST", "path": f"/api/pages/{page_ref}/publish", "body": None}
+
+
+def record(profile: LoadProfile, path: str):
+    with open(path, "w") as f:
+        f.write(json.dumps({"profile": asdict(profile)}) + "\n")
+        for req in synthesize(profile):
+            f.write(json.dumps(req) + "\n")
+
+
+def load_recording(path: str) -> Tuple[LoadProfile, Iterator[Dict[str, Any]]]:
+    f = open(path)
+    header = json.loads(f.readline())
+    profile = LoadProfile(**header["profile"])
+
+    def requests():
+        with f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    return profile, requests()
+
+
+def _entities(body: Any) -> List[Dict[str, Any]]:
+    """Sites and pages in a response body (a model, a list of them, or publish's {"page": ...})."""
+    candidates = body if isinstance(body, list) else [body, body.get("page")] if isinstance(body, dict) else []
+    return [c for c in candidates if isinstance(c, dict) and "id" in c]
+
+
+class EventRecorder:
+    """
+    Capture hook: wrap a lambda_handler so every event it serves is appended
+    to a JSONL capture, with the sites and pages its response returned. Those
+    entities let --replay seed stand-ins for the captured ids.
+    """
+    def __init__(self, path: str):
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+        self._seen_pages = set()
+
+    def wrap(self, handler):
+        def recording_handler(event, context):
+            resp = handler(event, context)
+            self.record(event, resp)
+            return resp
+        return recording_handler
+
+    def record(self, event: Dict[str, Any], resp: Dict[str, Any]):
+        try:
+            body = json.loads(resp.get("body") or "null")
+        except ValueError:
+            body = None
+        entities = []
+        with self._lock:
+            for e in _entities(body):
+                if "owner_account_id" in e:
+                    entities.append({"kind": "site", "id": e["id"], "owner": e["owner_account_id"],
+                                     "name": e.get("name"), "slug": e.get("slug")})
+                elif "site_id" in e:
+                    page = {"kind": "page", "id": e["id"], "site_id": e["site_id"], "name": e.get("name"),
+                            "slug": e.get("slug"), "published": e.get("published_state") is not None}
+                    if e["id"] not in self._seen_pages:
+                        # Page bodies are the bulk of a capture; keep one copy for seeding.
+                        page["editor_state"] = e.get("editor_state")
+                        self._seen_pages.add(e["id"])
+                    entities.append(page)
+            line = {"event": event, "status": resp.get("statusCode"), "entities": entities}
+            self._file.write(json.dumps(line) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+@dataclass
+class CapturePlan:
+    """What to seed before replaying a capture: captured id -> how to recreate it."""
+    sites: Dict[str, Dict[str, Any]]
+    pages: Dict[str, Dict[str, Any]]
+
+
+def _event_account(event: Dict[str, Any]) -> str:
+    # Mirrors lambda_function.get_current_account_id for header-based accounts.
+    headers = event.get("headers") or {}
+    return headers.get("x-account-id") or headers.get("X-Account-Id") or "dev-account-1"
+
+
+def load_capture(path: str) -> Tuple[CapturePlan, List[Dict[str, Any]]]:
+    """
+    Turn a capture written by EventRecorder into a seeding plan plus requests
+    whose captured ids are replaced by {site:<id>} / {page:<id>} refs. Ids the
+    capture never saw returned (e.g. requests that 404ed) are left as they are.
+    Create requests replay as creates, so they make new entities alongside the
+    seeded ones.
+    """
+    plan = CapturePlan(sites={}, pages={})
+    captured = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            account = _event_account(entry["event"])
+            for e in entry.get("entities", []):
+                if e["kind"] == "site":
+                    plan.sites.setdefault(e["id"], {"owner": e["owner"], "name": e.get("name"), "slug": e.get("slug")})
+                else:
+                    page = plan.pages.setdefault(e["id"], {})
+                    for k in ("site_id", "name", "slug", "editor_state"):
+                        if page.get(k) is None and e.get(k) is not None:
+                            page[k] = e[k]
+                    page["published"] = page.get("published", False) or e.get("published", False)
+                    # Only the owner sees a page, so a 2xx response identifies its site's owner.
+                    if (entry.get("status") or 500) < 300:
+                        plan.sites.setdefault(e["site_id"], {"owner": account, "name": None, "slug": None})
+            captured.append((account, entry["event"]))
+
+    requests = []
+    for account, event in captured:
+        path = event.get("path") or ""
+        m = ENTITY_PATH.match(path)
+        if m:
+            collection, entity_id, rest = m.groups()
+            kind = "site" if collection == "sites" else "page"
+            if entity_id in (plan.sites if kind == "site" else plan.pages):
+                path = f"/api/{collection}/{{{kind}:{entity_id}}}{rest}"
+        body = event.get("body")
+        requests.append({
+            "account": account,
+            "method": event.get("httpMethod", ""),
+            "path": path,
+            "body": json.loads(body) if body else None,
+        })
+    return plan, requests
+
+
+def _is_capture(path: str) -> bool:
+    with open(path) as f:
+        return "event" in json.loads(f.readline() or "{}")
+
+
+def install_stand_ins() -> Tuple[LocalDynamoResource, InMemoryStorageBackend]:
+    """Point lambda_function at fresh local DynamoDB/S3 stand-ins and return them."""
+    # boto3 needs a region to build the (unused) real DynamoDB resource at import.
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    import lambda_function
+    import repositories_dynamo
+
+    dynamo = LocalDynamoResource()
+    storage = InMemoryStorageBackend()
+    storage.emit_metrics = False  # keep the report the only output
+    repositories_dynamo.dynamodb = dynamo
+    lambda_function.storage = storage
+    return dynamo, storage
+
+
+def _call(method: str, path: str, account: str, body=None) -> Dict[str, Any]:
+    from lambda_function import lambda_handler
+    from local_runner import make_event
+
+    event = make_event(method, path, body, {"x-account-id": account})
+    return lambda_handler(event, None)
+
+
+def _seed_site(account: str, name: str, slug: str) -> str:
+    resp = _call("POST", "/api/sites", account, {"name": name, "slug": slug})
+    if resp["statusCode"] != 201:
+        raise RuntimeError(f"Seeding site failed: {resp['body']}")
+    return json.loads(resp["body"])["id"]
+
+
+def _seed_page(account: str, site_id: str, data: Dict[str, Any]) -> str:
+    resp = _call("POST", f"/api/sites/{site_id}/pages", account, data)
+    if resp["statusCode"] != 201:
+        raise RuntimeError(f"Seeding page failed: {resp['body']}")
+    return json.loads(resp["body"])["id"]
+
+
+def seed(profile: LoadProfile) -> Dict[tuple, str]:
+    """Create every tenant's sites and pages through the API; returns ref -> id."""
+    rng = random.Random(profile.seed)
+    refs: Dict[tuple, str] = {}
+    for t in range(profile.tenants):
+        for s in range(profile.sites_per_tenant):
+            site_id = _seed_site(_account(t), f"Site {s}", f"site-{s}")
+            refs[("site", f"{t}:{s}")] = site_id
+
+            for p in range(profile.pages_per_site):
+                refs[("page", f"{t}:{s}:{p}")] = _seed_page(_account(t), site_id, {
+                    "name": f"Page {p}",
+                    "slug": "" if p == 0 else f"page-{p}",
+                    "editor_state": _editor_state(rng, profile.page_size),
+                })
+    return refs
+
+
+def seed_capture(plan: CapturePlan) -> Dict[tuple, str]:
+    """Create a stand-in for every captured site and page; returns ref -> new id."""
+    refs: Dict[tuple, str] = {}
+    for captured_id, site in plan.sites.items():
+        refs[("site", captured_id)] = _seed_site(site["owner"], site.get("name") or "Captured Site",
+                                                  site.get("slug") or "captured")
+    for captured_id, page in plan.pages.items():
+        site_id = refs.get(("site", page.get("site_id")))
+        if not site_id:
+            continue  # never saw who owns it; requests for it replay unresolved
+        owner = plan.sites[page["site_id"]]["owner"]
+        page_id = _seed_page(owner, site_id, {
+            "name": page.get("name") or "Captured Page",
+            "slug": page.get("slug") or "",
+            "editor_state": page.get("editor_state") or {},
+        })
+        if page.get("published"):
+            _call("POST", f"/api/pages/{page_id}/publish", owner)
+        refs[("page", captured_id)] = page_id
+    return refs
+
+
+def resolve(path: str, refs: Dict[tuple, str]) -> str:
+    return REF.sub(lambda m: refs[(m.group(1), m.group(2))], path)
+
+
+def route_of(method: str, path: str) -> str:
+    path = REF.sub(lambda m: "{" + m.group(1) + "Id}", path)
+    # Ids a capture couldn't map still belong to their route, not a row of their own.
+    m = ENTITY_PATH.match(path)
+    if m and not m.group(2).startswith("{"):
+        collection, _, rest = m.groups()
+        path = f"/api/{collection}/{{{'site' if collection == 'sites' else 'page'}Id}}{rest}"
+    return f"{method} {path}"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[idx]
+
+
+def run(requests: Iterator[Dict[str, Any]], refs: Dict[tuple, str], concurrency: int):
+    """Replay requests from `concurrency` threads; returns (elapsed, latencies, errors) per route."""
+    from lambda_function import lambda_handler
+    from local_runner import make_event
+
+    source_lock = threading.Lock()
+    results = []
+
+    def worker():
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        while True:
+            with source_lock:
+                req = next(requests, None)
+            if req is None:
+                break
+            route = route_of(req["method"], req["path"])
+            path = resolve(req["path"], refs)
+            event = make_event(req["method"], path, req.get("body"), {"x-account-id": req["account"]})
+            # Time only the handler: building the event is client-side work.
+            start = time.perf_counter()
+            resp = lambda_handler(event, None)
+            latencies[route].append(time.perf_counter() - start)
+            if resp["statusCode"] >= 400:
+                errors[route] += 1
+        results.append((latencies, errors))
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    for lat, err in results:
+        for route, values in lat.items():
+            latencies[route].extend(values)
+        for route, count in err.items():
+            errors[route] += count
+    return elapsed, latencies, errors
+
+
+def build_report(profile: Optional[LoadProfile], concurrency: int, elapsed: float, latencies, errors,
+                 dynamo: LocalDynamoResource, storage: InMemoryStorageBackend) -> Dict[str, Any]:
+    total = sum(len(v) for v in latencies.values())
+    routes = {}
+    for route in sorted(latencies):
+        values = sorted(latencies[route])
+        routes[route] = {
+            "count": len(values),
+            "errors": errors.get(route, 0),
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": values[-1] * 1000,
+        }
+    tables = {}
+    for name, table in sorted(dynamo.tables.items()):
+        cap = table.capacity
+        tables[name] = {
+            "items": len(table.items),
+            "reads": cap.reads,
+            "writes": cap.writes,
+            "read_units": cap.read_units,
+            "write_units": cap.write_units,
+            "rcu_per_sec": cap.read_units / elapsed if elapsed else 0.0,
+            "wcu_per_sec": cap.write_units / elapsed if elapsed else 0.0,
+        }
+    return {
+        "profile": asdict(profile) if profile else None,
+        "concurrency": concurrency,
+        "requests": total,
+        "elapsed_sec": elapsed,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "routes": routes,
+        "tables": tables,
+        "storage": {
+            "puts": storage.stats.puts,
+            "bytes_written": storage.stats.bytes_written,
+            "avg_put_ms": storage.stats.avg_put_ms,
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    p = report["profile"]
+    print(f"{report['requests']} requests in {report['elapsed_sec']:.2f}s "
+          f"({report['throughput_rps']:.1f} req/s), concurrency {report['concurrency']}")
+    if p:
+        print(f"{p['tenants']} tenants x {p['sites_per_tenant']} sites x {p['pages_per_site']} pages, "
+              f"{p['page_size']}B pages, mix {p['read']}:{p['write']}:{p['publish']}")
+    else:
+        print("replayed captured traffic")
+    print()
+    print(f"{'route':<36} {'count':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for route, r in report["routes"].items():
+        print(f"{route:<36} {r['count']:>7} {r['errors']:>7} {r['p50_ms']:>8.2f} "
+              f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}")
+    print()
+    print(f"{'table':<12} {'items':>8} {'RCU':>10} {'WCU':>10} {'RCU/s':>9} {'WCU/s':>9}")
+    for name, t in report["tables"].items():
+        print(f"{name:<12} {t['items']:>8} {t['read_units']:>10.1f} {t['write_units']:>10.1f} "
+              f"{t['rcu_per_sec']:>9.1f} {t['wcu_per_sec']:>9.1f}")
+    s = report["storage"]
+    print()
+    print(f"storage: {s['puts']} puts, {s['bytes_written']} bytes, avg {s['avg_put_ms']:.3f} ms/put")
+
+
+def _parse_mix(value: str) -> Tuple[int, int, int]:
+    parts = value.split(":")
+    if len(parts) != 3 or not all(x.isdigit() for x in parts) or sum(map(int, parts)) == 0:
+        raise argparse.ArgumentTypeError("mix must be read:write:publish weights, e.g. 70:25:5")
+    return tuple(int(x) for x in parts)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay mixed multi-tenant traffic against lambda_handler.")
+    parser.add_argument("--tenants", type=int, default=LoadProfile.tenants)
+    parser.add_argument("--sites-per-tenant", type=int, default=LoadProfile.sites_per_tenant)
+    parser.add_argument("--pages-per-site", type=int, default=LoadProfile.pages_per_site)
+    parser.add_argument("--page-size", type=int, default=LoadProfile.page_size, help="raw_html bytes per page")
+    parser.add_argument("--mix", type=_parse_mix, default=(LoadProfile.read, LoadProfile.write, LoadProfile.publish),
+                        help="read:write:publish weights")
+    parser.add_argument("--requests", type=int, default=LoadProfile.requests)
+    parser.add_argument("--seed", type=int, default=LoadProfile.seed)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--record", help="write the synthesized stream to this file and exit")
+    parser.add_argument("--replay", help="replay a stream written by --record, or an EventRecorder capture")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    plan = None
+    if args.replay and _is_capture(args.replay):
+        profile = None
+        plan, captured = load_capture(args.replay)
+        requests = iter(captured)
+    elif args.replay:
+        profile, requests = load_recording(args.replay)
+    else:
+        read, write, publish = args.mix
+        profile = LoadProfile(
+            tenants=args.tenants,
+            sites_per_tenant=args.sites_per_tenant,
+            pages_per_site=args.pages_per_site,
+            page_size=args.page_size,
+            read=read,
+            write=write,
+            publish=publish,
+            requests=args.requests,
+            seed=args.seed,
+        )
+        if args.record:
+            record(profile, args.record)
+            print(f"Recorded {profile.requests} requests to {args.record}", file=sys.stderr)
+            return 0
+        requests = synthesize(profile)
+
+    dynamo, storage = install_stand_ins()
+
+    if plan:
+        print(f"Seeding {len(plan.sites)} sites and {len(plan.pages)} pages from the capture...", file=sys.stderr)
+        refs = seed_capture(plan)
+    else:
+        print(f"Seeding {profile.tenants * profile.sites_per_tenant * profile.pages_per_site} pages...",
+              file=sys.stderr)
+        refs = seed(profile)
+    dynamo.reset_capacity()
+    storage.stats = StorageStats()
+
+    elapsed, latencies, errors = run(requests, refs, args.concurrency)
+    report = build_report(profile, args.concurrency, elapsed, latencies, errors, dynamo, storage)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,31 @@
 import json
 import os
-from lambda_function import lambda_handler
 
-# For local tests, you can set BUILDER_BUCKET if you want publish to actually work.
+# For local tests, publish to disk instead of S3 (see storage.get_storage_backend).
+# Must be set before lambda_function is imported.
+# os.environ["STORAGE_BACKEND"] = "local"
+# os.environ["LOCAL_STORAGE_DIR"] = "published"
+# Or set BUILDER_BUCKET (+ AWS creds) to publish to S3.
 # os.environ["BUILDER_BUCKET"] = "your-bucket-name"
 
-def invoke(method: str, path: str, body=None, headers=None):
-    event = {
+from lambda_function import lambda_handler
+
+# Set CAPTURE_EVENTS=capture.jsonl to record every invoked event for `loadgen.py --replay`.
+if os.environ.get("CAPTURE_EVENTS"):
+    from loadgen import EventRecorder
+    lambda_handler = EventRecorder(os.environ["CAPTURE_EVENTS"]).wrap(lambda_handler)
+
+def make_event(method: str, path: str, body=None, headers=None):
+    return {
         "httpMethod": method,
         "path": path,
         "headers": headers or {"x-account-id": "dev-account-1"},
         "body": json.dumps(body) if body is not None else None,
         "requestContext": {},
     }
+
+def invoke(method: str, path: str, body=None, headers=None):
+    event = make_event(method, path, body, headers)
     resp = lambda_handler(event, None)
     print(method, path, resp["statusCode"])
     print(resp["body"])
@@ -39,5 +52,5 @@ if __name__ == "__main__":
     # List pages
     invoke("GET", f"/api/sites/{site_id}/pages")
 
-    # Publish (requires BUILDER_BUCKET set + AWS creds)
+    # Publish (requires STORAGE_BACKEND=local, or BUILDER_BUCKET set + AWS creds)
     # invoke("POST", f"/api/pages/{page_id}/publish")
@@ -1,6 +1,17 @@
 from typing import Dict, Any
 
 
+def page_filename(slug: str) -> str:
+    """
+    Published file name for a page slug ("" slug = homepage => index.html).
+    Empty, "." and ".." segments are dropped so a slug can never point outside
+    the site's folder (in S3 or in an exported zip).
+    """
+    parts = (slug or "").replace("\\", "/").split("/")
+    path = "/".join(p for p in parts if p not in ("", ".", ".."))
+    return f"{path or 'index'}.html"
+
+
 def render_page_to_html(editor_state: Dict[str, Any], site_settings: Dict[str, Any]) -> str:
     """
     Placeholder renderer to prove Phase 1 publishing.
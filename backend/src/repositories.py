@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from models import Site, Page, generate_id, now_iso
 
 
@@ -26,6 +26,11 @@ class PageRepository(ABC):
     def list_by_site(self, site_id: str) -> List[Page]:
         ...
 
+    @abstractmethod
+    def iter_by_site(self, site_id: str) -> Iterator[Page]:
+        """Yield a site's pages without materializing the whole list."""
+        ...
+
     @abstractmethod
     def get_by_id(self, page_id: str) -> Optional[Page]:
         ...
@@ -91,6 +96,9 @@ class InMemoryPageRepository(PageRepository):
     def list_by_site(self, site_id: str) -> List[Page]:
         return [p for p in self.pages.values() if p.site_id == site_id]
 
+    def iter_by_site(self, site_id: str) -> Iterator[Page]:
+        return (p for p in list(self.pages.values()) if p.site_id == site_id)
+
     def get_by_id(self, page_id: str) -> Optional[Page]:
         return self.pages.get(page_id)
 
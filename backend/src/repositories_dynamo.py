@@ -1,7 +1,7 @@
 import os
 import boto3
 from boto3.dynamodb.conditions import Key
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 
 from models import Site, Page, generate_id, now_iso
 
@@ -183,6 +183,21 @@ class DynamoPageRepository:
         items = resp.get("Items", [])
         return [_page_from_item(i) for i in items]
 
+    def iter_by_site(self, site_id: str) -> Iterator[Page]:
+        # Follows LastEvaluatedKey so only one query page (<= 1MB) is held at a time.
+        t = _pages_table()
+        kwargs = {
+            "KeyConditionExpression": Key("pk").eq(f"SITE#{site_id}") & Key("sk").begins_with("PAGE#"),
+        }
+        while True:
+            resp = t.query(**kwargs)
+            for item in resp.get("Items", []):
+                yield _page_from_item(item)
+            last_key = resp.get("LastEvaluatedKey")
+            if not last_key:
+                return
+            kwargs["ExclusiveStartKey"] = last_key
+
     def get_by_id(self, page_id: str) -> Optional[Page]:
         # Use GSI to lookup by page_id without knowing site_id
         t = _pages_table()
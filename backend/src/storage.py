@@ -1,20 +1,234 @@
+import json
 import os
-import boto3
+import shutil
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
 
-s3 = boto3.client("s3")
+HTML_CONTENT_TYPE = "text/html; charset=utf-8"
+NO_CACHE = "no-cache, no-store, must-revalidate"
 
+METRICS_NAMESPACE = "FailureGuru/Builder"
 
-def upload_html_to_s3(key: str, html: str) -> str:
-    bucket = os.environ.get("BUILDER_BUCKET")
-    if not bucket:
-        raise ValueError("Missing env var BUILDER_BUCKET")
+# Published files must be readable by a web server running as another user.
+PUBLISHED_FILE_MODE = 0o644
 
-    s3.put_object(
-        Bucket=bucket,
-        Key=key,
-        Body=html.encode("utf-8"),
-        ContentType="text/html; charset=utf-8",
-        CacheControl="no-cache, no-store, must-revalidate",
-    )
 
-    return f"https://{bucket}.s3.amazonaws.com/{key}"
+def _metrics_enabled() -> bool:
+    # On by default in Lambda, where stdout goes to CloudWatch Logs.
+    default = "emf" if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") else "off"
+    return os.environ.get("STORAGE_METRICS", default).lower() == "emf"
+
+
+@dataclass
+class StorageStats:
+    puts: int = 0
+    deletes: int = 0
+    bytes_written: int = 0
+    put_seconds: float = 0.0
+
+    @property
+    def avg_put_ms(self) -> float:
+        return (self.put_seconds / self.puts) * 1000 if self.puts else 0.0
+
+
+def _remaining_size(fileobj: BinaryIO) -> int:
+    start = fileobj.tell()
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell() - start
+    fileobj.seek(start)
+    return size
+
+
+class StorageBackend(ABC):
+    """
+    Where published pages and exports are written.
+    Callers use put_object/put_file/delete_objects, which record latency and
+    bytes written in `stats`; implementations provide the underscored methods.
+    With STORAGE_METRICS=emf (the default in Lambda) each put is also printed
+    as a CloudWatch Embedded Metric Format line, which CloudWatch turns into
+    PutLatency / BytesWritten metrics per backend.
+    """
+    def __init__(self):
+        self.stats = StorageStats()
+        self._stats_lock = threading.Lock()
+        self.emit_metrics = _metrics_enabled()
+
+    def put_object(self, key: str, body: bytes, content_type: str = HTML_CONTENT_TYPE,
+                   cache_control: Optional[str] = NO_CACHE) -> str:
+        start = time.perf_counter()
+        self._put_object(key, body, content_type, cache_control)
+        self._record_put(key, len(body), time.perf_counter() - start)
+        return self.url_for(key)
+
+    def put_file(self, key: str, fileobj: BinaryIO, content_type: str,
+                 cache_control: Optional[str] = None) -> str:
+        size = _remaining_size(fileobj)
+        start = time.perf_counter()
+        self._put_file(key, fileobj, content_type, cache_control)
+        self._record_put(key, size, time.perf_counter() - start)
+        return self.url_for(key)
+
+    def delete_objects(self, keys: Iterable[str]) -> int:
+        count = self._delete_objects(list(keys))
+        with self._stats_lock:
+            self.stats.deletes += count
+        return count
+
+    def download_url(self, key: str, expires_in: int = 3600) -> str:
+        """URL a client can fetch `key` from. Private backends override this to sign it."""
+        return self.url_for(key)
+
+    def _record_put(self, key: str, size: int, seconds: float):
+        with self._stats_lock:
+            self.stats.puts += 1
+            self.stats.bytes_written += size
+            self.stats.put_seconds += seconds
+        if self.emit_metrics:
+            self._emit_put_metrics(key, size, seconds)
+
+    def _emit_put_metrics(self, key: str, size: int, seconds: float):
+        print(json.dumps({
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": METRICS_NAMESPACE,
+                    "Dimensions": [["Backend"]],
+                    "Metrics": [
+                        {"Name": "PutLatency", "Unit": "Milliseconds"},
+                        {"Name": "BytesWritten", "Unit": "Bytes"},
+                    ],
+                }],
+            },
+            "Backend": type(self).__name__,
+            "PutLatency": seconds * 1000,
+            "BytesWritten": size,
+            "key": key,
+        }), flush=True)
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        ...
+
+    @abstractmethod
+    def _put_object(self, key: str, body: bytes, content_type: str, cache_control: Optional[str]):
+        ...
+
+    @abstractmethod
+    def _put_file(self, key: str, fileobj: BinaryIO, content_type: str, cache_control: Optional[str]):
+        ...
+
+    @abstractmethod
+    def _delete_objects(self, keys: list) -> int:
+        ...
+
+
+class LocalFileStorageBackend(StorageBackend):
+    """
+    Writes objects under a directory, for offline runs and tests.
+    Each write goes to a temp file in the target directory, is fsynced and
+    renamed into place, so readers never see a half-written page and a crash
+    leaves either the old or the new file. Files are world-readable (0644).
+    """
+    def __init__(self, root: str, base_url: Optional[str] = None):
+        super().__init__()
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/") if base_url else None
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Key escapes storage root: {key}")
+        return path
+
+    def url_for(self, key: str) -> str:
+        if self.base_url:
+            return f"{self.base_url}/{key}"
+        return self._path(key).as_uri()
+
+    def _atomic_write(self, key: str, write):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+                f.flush()
+                os.fchmod(f.fileno(), PUBLISHED_FILE_MODE)  # mkstemp creates 0600
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            self._fsync_dir(path.parent)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _fsync_dir(directory: Path):
+        # Persist the rename itself, so a crash can't roll back to the old file.
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _put_object(self, key: str, body: bytes, content_type: str, cache_control: Optional[str]):
+        self._atomic_write(key, lambda f: f.write(body))
+
+    def _put_file(self, key: str, fileobj: BinaryIO, content_type: str, cache_control: Optional[str]):
+        self._atomic_write(key, lambda f: shutil.copyfileobj(fileobj, f))
+
+    def _delete_objects(self, keys: list) -> int:
+        deleted = 0
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+                deleted += 1
+            except FileNotFoundError:
+                pass
+        return deleted
+
+
+class InMemoryStorageBackend(StorageBackend):
+    """
+    Dev-only backend for benchmarks; keeps (body, content_type, cache_control) per key.
+    """
+    def __init__(self):
+        super().__init__()
+        self.objects: Dict[str, Tuple[bytes, str, Optional[str]]] = {}
+
+    def url_for(self, key: str) -> str:
+        return f"memory://{key}"
+
+    def _put_object(self, key: str, body: bytes, content_type: str, cache_control: Optional[str]):
+        self.objects[key] = (body, content_type, cache_control)
+
+    def _put_file(self, key: str, fileobj: BinaryIO, content_type: str, cache_control: Optional[str]):
+        self.objects[key] = (fileobj.read(), content_type, cache_control)
+
+    def _delete_objects(self, keys: list) -> int:
+        return sum(1 for key in keys if self.objects.pop(key, None) is not None)
+
+
+def get_storage_backend() -> StorageBackend:
+    """
+    STORAGE_BACKEND selects the implementation: s3 (default), local or memory.
+    local writes under LOCAL_STORAGE_DIR (default ./published).
+    """
+    kind = os.environ.get("STORAGE_BACKEND", "s3").lower()
+    if kind == "local":
+        return LocalFileStorageBackend(
+            os.environ.get("LOCAL_STORAGE_DIR", "published"),
+            base_url=os.environ.get("LOCAL_STORAGE_BASE_URL"),
+        )
+    if kind == "memory":
+        return InMemoryStorageBackend()
+    if kind == "s3":
+        # Imported lazily so local/memory runs don't need boto3.
+        from storage_s3 import S3StorageBackend
+        return S3StorageBackend()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {kind}")
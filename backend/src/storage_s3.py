@@ -0,0 +1,96 @@
+import io
+import os
+from typing import BinaryIO, Optional
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+from storage import StorageBackend
+
+MB = 1024 * 1024
+
+# S3 DeleteObjects accepts at most 1000 keys per request.
+DELETE_BATCH_SIZE = 1000
+
+_client_config = Config(
+    max_pool_connections=int(os.environ.get("S3_MAX_POOL_CONNECTIONS", "50")),
+    retries={"max_attempts": 5, "mode": "adaptive"},
+    tcp_keepalive=True,
+)
+
+# Module-level so warm Lambda invocations reuse the same connection pool.
+s3 = boto3.client("s3", config=_client_config)
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Publishes to BUILDER_BUCKET.
+    Bodies at or above multipart_threshold go through the managed transfer
+    (parallel multipart parts); smaller ones are a single put_object.
+    """
+    def __init__(self, bucket: Optional[str] = None, client=None,
+                 multipart_threshold: int = 8 * MB, multipart_chunksize: int = 8 * MB,
+                 max_concurrency: int = 10):
+        super().__init__()
+        self._bucket = bucket
+        self.client = client or s3
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=max_concurrency,
+        )
+
+    @property
+    def bucket(self) -> str:
+        bucket = self._bucket or os.environ.get("BUILDER_BUCKET")
+        if not bucket:
+            raise ValueError("Missing env var BUILDER_BUCKET")
+        return bucket
+
+    def url_for(self, key: str) -> str:
+        return f"https://{self.bucket}.s3.amazonaws.com/{key}"
+
+    def download_url(self, key: str, expires_in: int = 3600) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    def _extra_args(self, content_type: str, cache_control: Optional[str]):
+        extra = {"ContentType": content_type}
+        if cache_control:
+            extra["CacheControl"] = cache_control
+        return extra
+
+    def _put_object(self, key: str, body: bytes, content_type: str, cache_control: Optional[str]):
+        if len(body) >= self.transfer_config.multipart_threshold:
+            self._put_file(key, io.BytesIO(body), content_type, cache_control)
+            return
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=body,
+            **self._extra_args(content_type, cache_control),
+        )
+
+    def _put_file(self, key: str, fileobj: BinaryIO, content_type: str, cache_control: Optional[str]):
+        self.client.upload_fileobj(
+            fileobj,
+            self.bucket,
+            key,
+            ExtraArgs=self._extra_args(content_type, cache_control),
+            Config=self.transfer_config,
+        )
+
+    def _delete_objects(self, keys: list) -> int:
+        deleted = 0
+        for i in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[i:i + DELETE_BATCH_SIZE]
+            resp = self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": k} for k in batch], "Quiet": True},
+            )
+            deleted += len(batch) - len(resp.get("Errors", []))
+        return deleted
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Modules in src/ import each other flat, as they do when zipped into the Lambda.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# boto3 needs a region to build the DynamoDB resource at import; nothing calls AWS.
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
@@ -0,0 +1,114 @@
+import pytest
+
+import repositories_dynamo
+from dynamo_local import LocalDynamoResource, LocalTable, item_size
+
+
+@pytest.fixture
+def dynamo(monkeypatch):
+    resource = LocalDynamoResource()
+    monkeypatch.setattr(repositories_dynamo, "dynamodb", resource)
+    return resource
+
+
+def _padded(item, size):
+    """Pad item["pad"] so item_size(item) == size exactly."""
+    item = dict(item, pad="")
+    item["pad"] = "x" * (size - item_size(item))
+    assert item_size(item) == size
+    return item
+
+
+def test_iter_by_site_follows_pagination_across_1mb_pages(dynamo):
+    repo = repositories_dynamo.DynamoPageRepository()
+    site_id = "site-1"
+    created = {
+        repo.create(site_id, {"name": f"p{i}", "slug": f"p{i}", "editor_state": {"raw_html": "x" * 10_000}}).id
+        for i in range(300)
+    }
+    # Another site's pages must not leak into the query.
+    repo.create("site-2", {"name": "other"})
+
+    table = dynamo.Table("fg_pages")
+    first = table.query(
+        KeyConditionExpression=repositories_dynamo.Key("pk").eq(f"SITE#{site_id}"),
+    )
+    # ~3MB of pages, so the first query page stops at the 1MB limit.
+    assert "LastEvaluatedKey" in first
+    assert len(first["Items"]) < 300
+
+    ids = [p.id for p in repo.iter_by_site(site_id)]
+    assert len(ids) == 300
+    assert set(ids) == created
+
+
+def test_capacity_rounding():
+    table = LocalTable("t")
+
+    # 1025 bytes = 2 write units, charged again for the gsi1 copy.
+    table.put_item(Item=_padded({"pk": "A", "sk": "META", "gsi1pk": "G", "gsi1sk": "S"}, 1025))
+    assert table.capacity.write_units == 4.0
+
+    # Exactly 1KB without a GSI key = 1 write unit.
+    table.put_item(Item=_padded({"pk": "B", "sk": "META"}, 1024))
+    assert table.capacity.write_units == 5.0
+
+    # Eventually consistent reads: 0.5 per started 4KB, 0.5 minimum (even on a miss).
+    table.put_item(Item=_padded({"pk": "C", "sk": "META"}, 4097))
+    table.get_item(Key={"pk": "C", "sk": "META"})
+    assert table.capacity.read_units == 1.0
+    table.get_item(Key={"pk": "missing", "sk": "META"})
+    assert table.capacity.read_units == 1.5
+
+
+def test_query_touches_only_its_partition(dynamo):
+    repo = repositories_dynamo.DynamoPageRepository()
+    for i in range(10):
+        repo.create("mine", {"name": f"p{i}"})
+    table = dynamo.Table("fg_pages")
+
+    def examined_by_list():
+        before = table.items_examined
+        assert len(repo.list_by_site("mine")) == 10
+        return table.items_examined - before
+
+    alone = examined_by_list()
+    for site in range(200):
+        for i in range(20):
+            repo.create(f"other-{site}", {"name": f"p{i}"})
+    assert len(table.items) == 4010
+    assert examined_by_list() == alone == 10
+
+    # gsi1 lookups are partition reads too.
+    page_id = repo.list_by_site("mine")[0].id
+    before = table.items_examined
+    assert repo.get_by_id(page_id).id == page_id
+    assert table.items_examined - before == 1
+
+
+def test_put_moves_item_when_gsi_key_changes():
+    table = LocalTable("t")
+    cond = repositories_dynamo.Key("gsi1pk")
+    table.put_item(Item={"pk": "A", "sk": "META", "gsi1pk": "OWNER#1", "gsi1sk": "SITE#A"})
+    table.put_item(Item={"pk": "A", "sk": "META", "gsi1pk": "OWNER#2", "gsi1sk": "SITE#A"})
+    assert table.query(IndexName="gsi1", KeyConditionExpression=cond.eq("OWNER#1"))["Items"] == []
+    assert [i["pk"] for i in table.query(IndexName="gsi1", KeyConditionExpression=cond.eq("OWNER#2"))["Items"]] == ["A"]
+
+    # Dropping the gsi key removes it from the index entirely.
+    table.put_item(Item={"pk": "A", "sk": "META"})
+    assert table.query(IndexName="gsi1", KeyConditionExpression=cond.eq("OWNER#2"))["Items"] == []
+    assert len(table.query(KeyConditionExpression=repositories_dynamo.Key("pk").eq("A"))["Items"]) == 1
+
+
+def test_query_range_conditions_and_exclusive_start():
+    table = LocalTable("t")
+    for sk in ["META", "PAGE#1", "PAGE#2", "PAGE#3", "ZZZ"]:
+        table.put_item(Item={"pk": "S", "sk": sk})
+    key = repositories_dynamo.Key
+    resp = table.query(KeyConditionExpression=key("pk").eq("S") & key("sk").begins_with("PAGE#"), Limit=2)
+    assert [i["sk"] for i in resp["Items"]] == ["PAGE#1", "PAGE#2"]
+    rest = table.query(KeyConditionExpression=key("pk").eq("S") & key("sk").begins_with("PAGE#"),
+                       ExclusiveStartKey=resp["LastEvaluatedKey"])
+    assert [i["sk"] for i in rest["Items"]] == ["PAGE#3"]
+    assert "LastEvaluatedKey" not in rest
+    assert [i["sk"] for i in table.query(KeyConditionExpression=key("pk").eq("S") & key("sk").eq("ZZZ"))["Items"]] == ["ZZZ"]
@@ -0,0 +1,220 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+import exporter
+import lambda_function
+import repositories_dynamo
+from dynamo_local import LocalDynamoResource
+from exporter import ExportError, export_site_zip, render_pages, write_sitemaps, _export_jobs
+from models import Site, Page
+from renderer import page_filename
+from storage import InMemoryStorageBackend
+
+STATE = {"title": "T", "raw_html": "<p>x</p>"}
+
+
+def _site(**kwargs):
+    return Site(id="site-1", owner_account_id="acct", name="S", slug="s", **kwargs)
+
+
+def _page(slug, published=True, page_id=None, editor_state=None):
+    return Page(id=page_id or f"id-{slug}", site_id="site-1", name=slug, slug=slug,
+                editor_state=editor_state or STATE, published_state=STATE if published else None)
+
+
+def _zip(pages, **kwargs):
+    buf = io.BytesIO()
+    count = export_site_zip(_site(), pages, buf, **kwargs)
+    return count, zipfile.ZipFile(buf)
+
+
+@pytest.mark.parametrize("slug, expected", [
+    ("", "index.html"),
+    ("/", "index.html"),
+    (None, "index.html"),
+    ("about", "about.html"),
+    ("/about/", "about.html"),
+    ("../../evil", "evil.html"),
+    ("a/./b", "a/b.html"),
+    ("..\\..\\x", "x.html"),
+    ("blog//post", "blog/post.html"),
+])
+def test_page_filename(slug, expected):
+    assert page_filename(slug) == expected
+
+
+def test_export_jobs_skips_unpublished_pages():
+    jobs = list(_export_jobs([_page("a"), _page("draft", published=False)], include_drafts=False))
+    assert [name for name, _ in jobs] == ["a.html"]
+
+
+def test_export_jobs_include_drafts_uses_editor_state():
+    draft = {"title": "Draft"}
+    pages = [_page("a", editor_state=draft), _page("b", published=False, editor_state=draft)]
+    jobs = list(_export_jobs(pages, include_drafts=True))
+    assert jobs == [("a.html", draft), ("b.html", draft)]
+
+
+def test_export_colliding_slugs_raise():
+    with pytest.raises(ExportError, match="about.html"):
+        _zip([_page("about"), _page("/about/", page_id="other")])
+
+
+def test_export_zip_contents():
+    count, zf = _zip([_page(""), _page("about"), _page("../../evil"), _page("draft", published=False)],
+                     base_url="https://example.com/")
+    assert count == 3
+    assert zf.namelist() == ["index.html", "about.html", "evil.html", "sitemap.xml"]
+    assert "<p>x</p>" in zf.read("about.html").decode()
+    sitemap = zf.read("sitemap.xml").decode()
+    assert "<loc>https://example.com/</loc>" in sitemap
+    assert "<loc>https://example.com/about.html</loc>" in sitemap
+
+
+def test_export_without_base_url_omits_sitemap():
+    _, zf = _zip([_page("a")])
+    assert zf.namelist() == ["a.html"]
+
+
+def test_export_uses_primary_domain_for_sitemap():
+    buf = io.BytesIO()
+    export_site_zip(_site(primary_domain="ex.com"), [_page("")], buf)
+    assert "<loc>https://ex.com/</loc>" in zipfile.ZipFile(buf).read("sitemap.xml").decode()
+
+
+def _sitemap(names, base_url, **kwargs):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        write_sitemaps(zf, iter(names), len(names), base_url, **kwargs)
+    return zipfile.ZipFile(buf)
+
+
+def test_sitemap_rejects_relative_base_url():
+    with pytest.raises(ExportError):
+        _sitemap(["a.html"], "/sites/1")
+    with pytest.raises(ExportError):
+        _zip([_page("a")], base_url="example.com")
+
+
+def test_sitemap_escapes_urls():
+    xml = _sitemap(["a&b.html"], "https://ex.com").read("sitemap.xml").decode()
+    assert "<loc>https://ex.com/a&amp;b.html</loc>" in xml
+
+
+def test_sitemap_keeps_index_html_without_directory_index():
+    xml = _sitemap(["index.html", "blog/index.html"], "https://b.s3.amazonaws.com/sites/1",
+                   directory_index=False).read("sitemap.xml").decode()
+    assert "<loc>https://b.s3.amazonaws.com/sites/1/index.html</loc>" in xml
+    assert "<loc>https://b.s3.amazonaws.com/sites/1/blog/index.html</loc>" in xml
+
+
+def test_sitemap_splits_into_index(monkeypatch):
+    monkeypatch.setattr(exporter, "SITEMAP_MAX_URLS", 2)
+    zf = _sitemap([f"p{i}.html" for i in range(5)], "https://ex.com")
+    assert sorted(zf.namelist()) == ["sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml", "sitemap.xml"]
+    assert zf.read("sitemap-3.xml").decode().count("<url>") == 1
+    index = zf.read("sitemap.xml").decode()
+    assert "<sitemapindex" in index
+    assert "<loc>https://ex.com/sitemap-3.xml</loc>" in index
+
+
+def test_render_pages_pooled_keeps_order_and_bounds_window(monkeypatch):
+    monkeypatch.setattr(exporter, "POOL_MIN_RENDER_SECONDS", 0)
+    monkeypatch.setattr(exporter, "CHUNK_SIZE", 3)
+    monkeypatch.setattr(exporter, "POOL_MIN_PAGES", 4)
+    pooled_calls = []
+    real_pooled = exporter._render_pooled
+    monkeypatch.setattr(exporter, "_render_pooled", lambda *a: pooled_calls.append(1) or real_pooled(*a))
+
+    consumed = 0
+
+    def jobs():
+        nonlocal consumed
+        for i in range(50):
+            consumed += 1
+            yield f"p{i}.html", {"title": f"t{i}", "raw_html": f"<p>{i}</p>"}
+
+    workers = 2
+    max_ahead = exporter.POOL_MIN_PAGES + workers * exporter.IN_FLIGHT_CHUNKS_PER_WORKER * exporter.CHUNK_SIZE
+    out = []
+    for name, html in render_pages(jobs(), {}, workers=workers):
+        assert consumed <= len(out) + max_ahead
+        out.append((name, html))
+
+    assert pooled_calls
+    assert [name for name, _ in out] == [f"p{i}.html" for i in range(50)]
+    assert all(f"<title>t{i}</title>" in html for i, (_, html) in enumerate(out))
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(repositories_dynamo, "dynamodb", LocalDynamoResource())
+    storage = InMemoryStorageBackend()
+    storage.emit_metrics = False
+    monkeypatch.setattr(lambda_function, "storage", storage)
+
+    def call(method, path, account="acct", body=None):
+        resp = lambda_function.lambda_handler({
+            "httpMethod": method,
+            "path": path,
+            "headers": {"x-account-id": account},
+            "body": json.dumps(body) if body is not None else None,
+            "requestContext": {},
+        }, None)
+        return resp["statusCode"], json.loads(resp["body"])
+
+    return call, storage
+
+
+def _publish(call, site_id, slug):
+    _, page = call("POST", f"/api/sites/{site_id}/pages", body={"name": slug, "slug": slug, "editor_state": STATE})
+    assert call("POST", f"/api/pages/{page['id']}/publish")[0] == 200
+
+
+def test_export_route(api):
+    call, storage = api
+    _, site = call("POST", "/api/sites", body={"name": "S", "slug": "s"})
+    _publish(call, site["id"], "")
+    _publish(call, site["id"], "about")
+
+    status, body = call("GET", f"/api/sites/{site['id']}/export")
+    assert status == 200
+    assert body["page_count"] == 2
+    archive = storage.objects[f"exports/{site['id']}/s.zip"][0]
+    assert sorted(zipfile.ZipFile(io.BytesIO(archive)).namelist()) == ["about.html", "index.html"]
+
+
+def test_export_route_other_account_is_404(api):
+    call, _ = api
+    _, site = call("POST", "/api/sites", body={"name": "S"})
+    assert call("GET", f"/api/sites/{site['id']}/export", account="intruder")[0] == 404
+
+
+def test_export_route_slug_collision_is_409(api):
+    call, _ = api
+    _, site = call("POST", "/api/sites", body={"name": "S"})
+    _publish(call, site["id"], "about")
+    _publish(call, site["id"], "/about/")
+    status, body = call("GET", f"/api/sites/{site['id']}/export")
+    assert status == 409
+    assert "about.html" in body["error"]
+
+
+def test_cli_failed_export_leaves_no_file(tmp_path):
+    import export_site
+
+    out = tmp_path / "site.zip"
+
+    def failing(f):
+        export_site_zip(_site(), [_page("about"), _page("/about/", page_id="other")], f)
+
+    with pytest.raises(ExportError):
+        export_site._export_to_path(str(out), failing)
+    assert list(tmp_path.iterdir()) == []
+
+    assert export_site._export_to_path(str(out), lambda f: export_site_zip(_site(), [_page("a")], f)) == 1
+    assert zipfile.ZipFile(out).namelist() == ["a.html"]
+    assert [p.name for p in tmp_path.iterdir()] == ["site.zip"]
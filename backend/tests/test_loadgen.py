@@ -0,0 +1,142 @@
+import json
+from collections import Counter
+
+import pytest
+
+import loadgen
+from loadgen import LoadProfile
+
+
+def test_synthesize_is_deterministic_per_seed():
+    profile = LoadProfile(tenants=3, requests=200, seed=7)
+    assert list(loadgen.synthesize(profile)) == list(loadgen.synthesize(profile))
+    assert list(loadgen.synthesize(profile)) != list(loadgen.synthesize(LoadProfile(tenants=3, requests=200, seed=8)))
+
+
+def test_synthesize_honors_mix_weights():
+    def ops(read, write, publish):
+        profile = LoadProfile(read=read, write=write, publish=publish, page_size=16, requests=4000)
+        return Counter(r["method"] for r in loadgen.synthesize(profile))
+
+    counts = ops(70, 25, 5)
+    assert counts["GET"] + counts["PATCH"] + counts["POST"] == 4000
+    assert 0.65 < counts["GET"] / 4000 < 0.75
+    assert 0.20 < counts["PATCH"] / 4000 < 0.30
+    assert 0.03 < counts["POST"] / 4000 < 0.07
+
+    assert set(ops(0, 1, 0)) == {"PATCH"}
+    assert set(ops(0, 0, 1)) == {"POST"}
+
+
+def test_synthesize_autosave_body_has_page_size():
+    profile = LoadProfile(read=0, write=1, publish=0, page_size=1000, requests=1)
+    req = next(loadgen.synthesize(profile))
+    assert len(req["body"]["editor_state"]["raw_html"]) == len("<p></p>") + 1000
+
+
+def test_resolve_and_route_of():
+    refs = {("site", "1:0"): "S1", ("page", "1:0:2"): "P2", ("page", "abc-123"): "P9"}
+    assert loadgen.resolve("/api/sites/{site:1:0}/pages", refs) == "/api/sites/S1/pages"
+    assert loadgen.resolve("/api/pages/{page:1:0:2}/publish", refs) == "/api/pages/P2/publish"
+    assert loadgen.resolve("/api/pages/{page:abc-123}", refs) == "/api/pages/P9"
+    assert loadgen.resolve("/api/sites", refs) == "/api/sites"
+
+    assert loadgen.route_of("GET", "/api/sites/{site:1:0}/pages") == "GET /api/sites/{siteId}/pages"
+    assert loadgen.route_of("POST", "/api/pages/{page:abc-123}/publish") == "POST /api/pages/{pageId}/publish"
+    assert loadgen.route_of("GET", "/api/pages/unmapped-id") == "GET /api/pages/{pageId}"
+    assert loadgen.route_of("GET", "/api/sites") == "GET /api/sites"
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert loadgen.percentile(values, 50) == 50
+    assert loadgen.percentile(values, 95) == 95
+    assert loadgen.percentile(values, 100) == 100
+    assert loadgen.percentile([3.0], 99) == 3.0
+    assert loadgen.percentile([], 50) == 0.0
+
+
+def test_record_load_recording_round_trip(tmp_path):
+    path = tmp_path / "stream.jsonl"
+    profile = LoadProfile(tenants=2, requests=25, seed=3)
+    loadgen.record(profile, str(path))
+    loaded_profile, requests = loadgen.load_recording(str(path))
+    assert loaded_profile == profile
+    assert list(requests) == list(loadgen.synthesize(profile))
+    assert not loadgen._is_capture(str(path))
+
+
+def _report(requests, refs, dynamo, storage, profile=None):
+    elapsed, latencies, errors = loadgen.run(iter(requests), refs, concurrency=4)
+    return loadgen.build_report(profile, 4, elapsed, latencies, errors, dynamo, storage)
+
+
+def test_end_to_end_synthesized_run():
+    dynamo, storage = loadgen.install_stand_ins()
+    profile = LoadProfile(tenants=3, pages_per_site=4, page_size=256, requests=120, read=50, write=30, publish=20)
+    refs = loadgen.seed(profile)
+    assert len(refs) == 3 + 3 * 4
+    dynamo.reset_capacity()
+
+    report = _report(loadgen.synthesize(profile), refs, dynamo, storage, profile)
+    assert report["requests"] == 120
+    assert sum(r["count"] for r in report["routes"].values()) == 120
+    assert sum(r["errors"] for r in report["routes"].values()) == 0
+    assert report["tables"]["fg_pages"]["items"] == 12
+    assert report["tables"]["fg_pages"]["read_units"] > 0
+    publishes = report["routes"].get("POST /api/pages/{pageId}/publish", {}).get("count", 0)
+    assert storage.stats.puts == publishes
+
+
+def test_capture_replays_against_fresh_stand_ins(tmp_path):
+    loadgen.install_stand_ins()
+    import lambda_function
+    from local_runner import make_event
+
+    path = tmp_path / "capture.jsonl"
+    recorder = loadgen.EventRecorder(str(path))
+    handler = recorder.wrap(lambda_function.lambda_handler)
+
+    def call(method, route, body=None, account="alice"):
+        resp = handler(make_event(method, route, body, {"x-account-id": account}), None)
+        return resp["statusCode"], json.loads(resp["body"])
+
+    _, site = call("POST", "/api/sites", {"name": "Shop"})
+    _, page = call("POST", f"/api/sites/{site['id']}/pages", {"name": "Home", "slug": "", "editor_state": {"title": "v1"}})
+    call("PATCH", f"/api/pages/{page['id']}", {"editor_state": {"title": "v2"}})
+    call("POST", f"/api/pages/{page['id']}/publish")
+    call("GET", f"/api/sites/{site['id']}/pages")
+    recorder.close()
+    assert loadgen._is_capture(str(path))
+
+    plan, requests = loadgen.load_capture(str(path))
+    assert set(plan.sites) == {site["id"]}
+    assert plan.sites[site["id"]]["owner"] == "alice"
+    assert plan.pages[page["id"]]["published"] is True
+    assert requests[2]["path"] == f"/api/pages/{{page:{page['id']}}}"
+
+    # Fresh stores: the captured ids no longer exist, so they must be seeded.
+    dynamo, storage = loadgen.install_stand_ins()
+    refs = loadgen.seed_capture(plan)
+    assert refs[("page", page["id"])] != page["id"]
+
+    report = _report(requests, refs, dynamo, storage)
+    assert report["requests"] == 5
+    assert sum(r["errors"] for r in report["routes"].values()) == 0
+
+
+def test_importing_loadgen_leaves_environment_alone(monkeypatch):
+    import importlib
+    import os
+
+    monkeypatch.delenv("STORAGE_BACKEND", raising=False)
+    importlib.reload(loadgen)
+    assert "STORAGE_BACKEND" not in os.environ
+
+
+@pytest.mark.parametrize("value", ["70:25", "a:b:c", "0:0:0"])
+def test_parse_mix_rejects_bad_values(value):
+    import argparse
+
+    with pytest.raises(argparse.ArgumentTypeError):
+        loadgen._parse_mix(value)
@@ -0,0 +1,152 @@
+import io
+import os
+import stat
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+import storage
+from storage import InMemoryStorageBackend, LocalFileStorageBackend, get_storage_backend
+from storage_s3 import S3StorageBackend, DELETE_BATCH_SIZE, MB
+
+
+@pytest.fixture
+def local(tmp_path):
+    backend = LocalFileStorageBackend(str(tmp_path))
+    backend.emit_metrics = False
+    return backend
+
+
+def test_local_put_replaces_atomically(local, tmp_path):
+    local.put_object("sites/1/index.html", b"old")
+    local.put_object("sites/1/index.html", b"new")
+    assert (tmp_path / "sites/1/index.html").read_bytes() == b"new"
+    # No temp files left next to the page.
+    assert os.listdir(tmp_path / "sites/1") == ["index.html"]
+
+
+def test_local_put_is_world_readable(local, tmp_path):
+    local.put_object("a.html", b"x")
+    assert stat.S_IMODE(os.stat(tmp_path / "a.html").st_mode) == 0o644
+
+
+def test_local_failed_write_keeps_old_file(local, tmp_path):
+    local.put_object("a.html", b"old")
+
+    class Broken(io.BytesIO):
+        def read(self, *args):
+            raise IOError("disk on fire")
+
+    with pytest.raises(IOError):
+        local.put_file("a.html", Broken(b"new"), "text/html")
+    assert (tmp_path / "a.html").read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["a.html"]
+
+
+@pytest.mark.parametrize("key", ["../x", "", "a/../../x"])
+def test_local_rejects_keys_outside_root(local, key):
+    with pytest.raises(ValueError):
+        local.put_object(key, b"x")
+
+
+def test_local_delete_counts_only_existing(local, tmp_path):
+    local.put_object("a.html", b"x")
+    local.put_object("b.html", b"x")
+    assert local.delete_objects(["a.html", "missing.html", "b.html"]) == 2
+    assert local.stats.deletes == 2
+    assert os.listdir(tmp_path) == []
+
+
+def test_local_put_file_counts_remaining_bytes(local, tmp_path):
+    body = io.BytesIO(b"headerPAYLOAD")
+    body.seek(6)
+    url = local.put_file("exports/site.zip", body, "application/zip")
+    assert (tmp_path / "exports/site.zip").read_bytes() == b"PAYLOAD"
+    assert local.stats.puts == 1
+    assert local.stats.bytes_written == 7
+    assert url == (tmp_path / "exports/site.zip").as_uri()
+
+
+def test_emf_line_emitted(capsys):
+    backend = InMemoryStorageBackend()
+    backend.emit_metrics = True
+    backend.put_object("k", b"abc")
+    line = capsys.readouterr().out.strip()
+    assert '"BytesWritten": 3' in line
+    assert '"Backend": "InMemoryStorageBackend"' in line
+
+
+@pytest.fixture
+def s3():
+    client = boto3.client("s3", region_name="us-east-1",
+                          aws_access_key_id="test", aws_secret_access_key="test")
+    backend = S3StorageBackend(bucket="bucket", client=client)
+    backend.emit_metrics = False
+    with Stubber(client) as stubber:
+        yield backend, stubber
+        stubber.assert_no_pending_responses()
+
+
+def test_s3_small_body_is_single_put_without_cache_control(s3):
+    backend, stubber = s3
+    stubber.add_response("put_object", {}, {
+        "Bucket": "bucket",
+        "Key": "sites/1/a.html",
+        "Body": b"<p>x</p>",
+        "ContentType": "text/html; charset=utf-8",
+    })
+    url = backend.put_object("sites/1/a.html", b"<p>x</p>", cache_control=None)
+    assert url == "https://bucket.s3.amazonaws.com/sites/1/a.html"
+    assert backend.stats.bytes_written == 8
+
+
+def test_s3_put_sets_cache_control(s3):
+    backend, stubber = s3
+    stubber.add_response("put_object", {}, {
+        "Bucket": "bucket",
+        "Key": "a.html",
+        "Body": b"x",
+        "ContentType": "text/html; charset=utf-8",
+        "CacheControl": storage.NO_CACHE,
+    })
+    backend.put_object("a.html", b"x")
+
+
+def test_s3_large_body_uses_multipart(s3):
+    backend, _ = s3
+    calls = []
+    backend._put_file = lambda *args: calls.append(args)
+    backend.put_object("big.html", b"x" * (8 * MB))
+    assert len(calls) == 1
+
+
+def test_s3_deletes_in_batches_and_subtracts_errors(s3):
+    backend, stubber = s3
+    keys = [f"k{i}" for i in range(2 * DELETE_BATCH_SIZE + 500)]
+    for i, start in enumerate(range(0, len(keys), DELETE_BATCH_SIZE)):
+        batch = keys[start:start + DELETE_BATCH_SIZE]
+        errors = [{"Key": batch[0], "Code": "AccessDenied", "Message": "no"}] if i == 1 else []
+        stubber.add_response("delete_objects", {"Errors": errors}, {
+            "Bucket": "bucket",
+            "Delete": {"Objects": [{"Key": k} for k in batch], "Quiet": True},
+        })
+    assert backend.delete_objects(keys) == len(keys) - 1
+
+
+@pytest.mark.parametrize("kind, cls", [
+    ("local", LocalFileStorageBackend),
+    ("memory", InMemoryStorageBackend),
+    ("s3", S3StorageBackend),
+    ("S3", S3StorageBackend),
+])
+def test_get_storage_backend_selects_by_env(monkeypatch, tmp_path, kind, cls):
+    monkeypatch.setenv("STORAGE_BACKEND", kind)
+    monkeypatch.setenv("LOCAL_STORAGE_DIR", str(tmp_path))
+    assert isinstance(get_storage_backend(), cls)
+
+
+def test_get_storage_backend_rejects_unknown(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "ftp")
+    with pytest.raises(ValueError, match="ftp"):
+        get_storage_backend()